@@ -7,32 +7,40 @@ try:
     import sys
     import time
     import heapq
+    import bisect
     # import tkinter as tk
     # from tkinter import filedialog
+    from itertools import chain
     from collections import defaultdict
 except ImportError as e:
     print(f"Error importing module: {e}")
     print(f"Please ensure that required modules are installed...\n")
     sys.exit(1)
 
+# Share one adjacency between both search directions once this percentage of edges have a matching reverse edge
+SYMMETRY_THRESHOLD = 90
+# Relative slack on cost bounds, so float rounding in summed distances never prunes a path at the bound
+COST_TOLERANCE = 1e-9
+
 ##################################
 ### INPUT PROCESSING FUNCTIONS ###
 ##################################
 
 
-def process_input_file(input_file_path):
+def process_input_file(input_file_path, undirected=False):
     """
     Process the input file and extract parameters.
 
     Parameters:
     input_file_path (str): Directory path to the input file.
+    undirected (bool): Treat every edge as usable in both directions.
 
     Returns:
-    network (defaultdict): A dictionary structure representing the network.
+    network (Network): The network, sharing one adjacency between directions where edges are symmetric.
     num_vertices (int): The number of vertices present in the network.
     num_edges (int): The number of edges present in the network.
     source (str): The source vertex.
-    destination (str): The destination vertex.
+    destinations (list): The destination vertices, one or more.
     k_paths (int): The target number of k shortest loopless paths to find.
     """
     # Reading input file not included in algorithm time
@@ -43,42 +51,56 @@ def process_input_file(input_file_path):
         # Get remaining lines
         lines = f.readlines()
 
-        # Initialise network with defaultdict class from collections module
-        network = defaultdict(dict)
+        # Initialise edges with defaultdict class from collections module
+        edges = defaultdict(dict)
         for line in lines[:-1]:
             line_values = line.split()
             ai, bi = line_values[:-1]
             edge_weight = float(line_values[-1])
-            network[ai][bi] = edge_weight
+            edges[ai][bi] = edge_weight
+            if undirected:
+                edges[bi][ai] = edge_weight
 
         # Get last line parameters
         last_line = lines[-1].split()
-        source, destination = last_line[:-1]
+        source, *destinations = last_line[:-1]
         k_paths = int(last_line[-1])
 
+    network = Network.from_edges(edges)
+
     # Ensure input matches rest of file
     if source not in network:
         sys.exit("Input parameter 'source' not found in the network. Exiting...")
 
-    if destination not in network:
-        sys.exit("Input parameter 'destination' not found in the network. Exiting...")
+    if not destinations:
+        sys.exit("Input parameter 'destination' missing from the last line. Exiting...")
+
+    for destination in destinations:
+        if destination not in network:
+            sys.exit(f"Input parameter 'destination' {destination} not found in the network. Exiting...")
 
-    return network, num_vertices, num_edges, source, destination, k_paths
+    return network, num_vertices, num_edges, source, destinations, k_paths
 
 
 def get_input_file():
     """
-    Get the input file path from the command line arguments.
+    Get the input file path and options from the command line arguments.
 
     Returns:
-    str: The input file path.
+    input_file_path (str): The input file path.
+    undirected (bool): Whether the --undirected flag was given.
     """
-    if len(sys.argv) != 2:
-        sys.exit("Usage: python k_shortest_paths.py [input_file_path]")
+    args = sys.argv[1:]
+    undirected = '--undirected' in args
+    if undirected:
+        args.remove('--undirected')
 
-    input_file_path = sys.argv[1]
+    if len(args) != 1:
+        sys.exit("Usage: python k_shortest_paths.py [--undirected] [input_file_path]")
 
-    return input_file_path
+    input_file_path = args[0]
+
+    return input_file_path, undirected
 
 ####################################
 ### UTILITY AND HELPER FUNCTIONS ###
@@ -107,24 +129,232 @@ def timer(function_name):
 
     return wrapper
 
+
+def format_distances(distances):
+    """
+    Format path distances for output.
+
+    Parameters:
+    distances (list): A list of path distances.
+
+    Returns:
+    str: The distances to 4 decimal places, separated by commas.
+    """
+    return ", ".join(f"{distance:.4f}" for distance in distances)
+
+#######################
+### DATA STRUCTURES ###
+#######################
+
+
+class Network:
+    """
+    Weighted network that shares a single adjacency between the forward and backward searches.
+
+    Edges whose reverse edge has the same weight are kept once per endpoint in the shared adjacency,
+    which serves as both the forward and reverse adjacency. The remaining asymmetric edges are kept
+    apart in a forward and a reverse adjacency, so a directed network is held entirely in those.
+    """
+
+    def __init__(self, shared, frwd_edges, bkwd_edges):
+        """
+        Parameters:
+        shared (dict): Adjacency of symmetric edges, usable in both directions.
+        frwd_edges (dict): Adjacency of asymmetric edges, keyed by start vertex.
+        bkwd_edges (dict): Adjacency of asymmetric edges, keyed by end vertex.
+        """
+        self.shared = shared
+        self.frwd_edges = frwd_edges
+        self.bkwd_edges = bkwd_edges
+
+    @classmethod
+    def from_edges(cls, edges):
+        """
+        Build a network from an adjacency dict, detecting whether it is fully or mostly symmetric.
+
+        Parameters:
+        edges (dict): Adjacency of every edge, keyed by start vertex. Reused as the shared adjacency when symmetric.
+
+        Returns:
+        network (Network): The network built from the edges.
+        """
+        # Find edges without a matching reverse edge
+        asymmetric = []
+        num_edges = 0
+        for ai, neighbours in edges.items():
+            num_edges += len(neighbours)
+            for bi, edge_weight in neighbours.items():
+                if edges.get(bi, {}).get(ai) != edge_weight:
+                    asymmetric.append((ai, bi, edge_weight))
+
+        # Mostly directed network, keep every edge apart and build a true reverse adjacency
+        if (num_edges - len(asymmetric)) * 100 < num_edges * SYMMETRY_THRESHOLD:
+            bkwd_edges = defaultdict(dict)
+            for ai, neighbours in edges.items():
+                for bi, edge_weight in neighbours.items():
+                    bkwd_edges[bi][ai] = edge_weight
+            return cls({}, dict(edges), dict(bkwd_edges))
+
+        # Mostly symmetric network, move only the asymmetric exceptions out of the shared adjacency
+        frwd_edges = defaultdict(dict)
+        bkwd_edges = defaultdict(dict)
+        for ai, bi, edge_weight in asymmetric:
+            frwd_edges[ai][bi] = edge_weight
+            bkwd_edges[bi][ai] = edge_weight
+        for ai, bi, _ in asymmetric:
+            del edges[ai][bi]
+
+        return cls(dict(edges), dict(frwd_edges), dict(bkwd_edges))
+
+    def __contains__(self, vertex):
+        return vertex in self.shared or vertex in self.frwd_edges or vertex in self.bkwd_edges
+
+    @staticmethod
+    def _edges(shared, extra):
+        # Avoid chaining when only one of the adjacencies holds edges for the vertex
+        if extra is None:
+            return shared.items() if shared is not None else ()
+        if shared is None:
+            return extra.items()
+        return chain(shared.items(), extra.items())
+
+    def out_edges(self, vertex):
+        """
+        Get the edges leaving a vertex.
+
+        Parameters:
+        vertex (str): The start vertex.
+
+        Returns:
+        iterable: Pairs of end vertex and edge weight.
+        """
+        return self._edges(self.shared.get(vertex), self.frwd_edges.get(vertex))
+
+    def in_edges(self, vertex):
+        """
+        Get the edges entering a vertex.
+
+        Parameters:
+        vertex (str): The end vertex.
+
+        Returns:
+        iterable: Pairs of start vertex and edge weight.
+        """
+        return self._edges(self.shared.get(vertex), self.bkwd_edges.get(vertex))
+
+    def weight(self, ai, bi):
+        """
+        Get the weight of the edge from one vertex to another.
+
+        Parameters:
+        ai (str): The start vertex.
+        bi (str): The end vertex.
+
+        Returns:
+        float: The edge weight.
+        """
+        extra = self.frwd_edges.get(ai)
+        if extra is not None and bi in extra:
+            return extra[bi]
+        return self.shared[ai][bi]
+
+
+class PathTrie:
+    """
+    Parent-pointer prefix tree holding every accepted and candidate path found by Yen's algorithm.
+
+    Each node stands for the path from the source to that node, so paths sharing a root path share
+    the same nodes. Nodes are stored in parallel lists and referred to by integer id, node 0 being the source.
+    """
+
+    def __init__(self, source):
+        """
+        Parameters:
+        source (str): The source vertex, stored as the root node.
+        """
+        self.vertex = [source]
+        self.parent = [None]
+        self.cost = [0]
+        # Children dicts are only created once a node has a child
+        self.children = [None]
+
+    def extend(self, node, vertices, network):
+        """
+        Walk down the trie from a node along a list of vertices, creating nodes where the path is new.
+
+        Parameters:
+        node (int): The node the vertices continue on from.
+        vertices (list): The vertices following the node's vertex, in path order.
+        network (Network): The network, used for edge weights.
+
+        Returns:
+        node (int): The node at the end of the path.
+        """
+        for vertex in vertices:
+            children = self.children[node]
+            if children is None:
+                children = self.children[node] = {}
+
+            child = children.get(vertex)
+            if child is None:
+                # New branch, cost follows on from the parent node
+                child = len(self.vertex)
+                self.vertex.append(vertex)
+                self.parent.append(node)
+                self.cost.append(self.cost[node] + network.weight(self.vertex[node], vertex))
+                self.children.append(None)
+                children[vertex] = child
+
+            node = child
+
+        return node
+
+    def chain(self, node):
+        """
+        Follow parent pointers to get the nodes from the root down to a node.
+
+        Parameters:
+        node (int): The last node of the path.
+
+        Returns:
+        nodes (list): A list of node ids from the root to the node.
+        """
+        nodes = []
+        while node is not None:
+            nodes.append(node)
+            node = self.parent[node]
+        nodes.reverse()
+
+        return nodes
+
 #####################################
 ### ALGORITHM EXECUTION FUNCTIONS ###
 #####################################
 
 
-def bidirectional_dijkstra(network, source, destination):
+def bidirectional_dijkstra(network, source, destination, admissible_vertices=None, excluded_edges=None,
+                           max_distance=float('inf')):
     """
     Helper function implementing bidirectional Dijkstra's algorithm to find the shortest path in a network.
 
     Parameters:
-    network (defaultdict): A dictionary structure representing the network.
+    network (Network): The network, searched forwards from the source and backwards from the destination.
     source (str): The source vertex.
     destination (str): The destination vertex.
+    admissible_vertices (set): Optional vertices the path is restricted to, besides the source.
+    excluded_edges (dict): Optional mapping of a vertex to the set of neighbours that may not be stepped to from it.
+    max_distance (float): Only paths shorter than this distance are searched for.
 
     Returns:
     path (list): A list of vertices representing the shortest path.
     distance (float): The summed distance of the path.
     """
+    if source == destination:
+        return [source], 0
+
+    if excluded_edges is None:
+        excluded_edges = {}
+
     # Initialise bidirectional search
 
     # Cumulative distance dicts from both directions
@@ -139,70 +369,76 @@ def bidirectional_dijkstra(network, source, destination):
     # Vertex that both paths converge on
     meeting_vertex = None
     # Minimum path distance found
-    min_distance = float('inf')
+    min_distance = max_distance
 
     # Loop until one of the prio queues are empty
     while frwd_prio_queue and bkwd_prio_queue:
+        # No shorter path can be found once the two search frontiers together reach the best distance
+        if frwd_prio_queue[0][0] + bkwd_prio_queue[0][0] >= min_distance:
+            break
 
         # Forward search
         # Pop and return lowest weight and vertex heap in prio queue based on edge weights
         frwd_edge_weight, frwd_current_vertex = heapq.heappop(frwd_prio_queue)
 
-        # Check if current vertex already visited by backward search
-        if frwd_current_vertex in bkwd_edge_distance:
-            # Find distance
-            total_distance = frwd_edge_distance[frwd_current_vertex] + \
-                bkwd_edge_distance[frwd_current_vertex]
-
-            # Check if current path is lower total distance so far
-            if total_distance < min_distance:
-                # Set new meeting vertex and minimum distance
-                meeting_vertex = frwd_current_vertex
-                min_distance = total_distance
-
-        # Skip iteration if current distance is shorter than next path
-        if frwd_edge_weight > frwd_edge_distance[frwd_current_vertex]:
-            continue
-
-        # Loop to find neighbours
-        for frwd_neighbour, frwd_weight in network[frwd_current_vertex].items():
-            # Calculate edge weight to neighbour
-            frwd_neighbour_weight = frwd_edge_distance[frwd_current_vertex] + frwd_weight
-
-            # Check if neighbour is better
-            if frwd_neighbour not in frwd_edge_distance or frwd_neighbour_weight < frwd_edge_distance[frwd_neighbour]:
-                # Set distance to neighbour and last vertex in search
-                frwd_edge_distance[frwd_neighbour] = frwd_neighbour_weight
-                frwd_last_vertex[frwd_neighbour] = frwd_current_vertex
-
-                # Add weight and neighbouring vertex heap to forward prio queue
-                heapq.heappush(frwd_prio_queue,
-                               (frwd_neighbour_weight, frwd_neighbour))
+        # Skip vertex if a shorter distance to it has already been settled
+        if frwd_edge_weight <= frwd_edge_distance[frwd_current_vertex]:
+            frwd_excluded = excluded_edges.get(frwd_current_vertex, ())
+
+            # Loop to find neighbours
+            for frwd_neighbour, frwd_weight in network.out_edges(frwd_current_vertex):
+                if frwd_neighbour in frwd_excluded or (
+                        admissible_vertices is not None and frwd_neighbour not in admissible_vertices):
+                    continue
+
+                # Calculate edge weight to neighbour
+                frwd_neighbour_weight = frwd_edge_weight + frwd_weight
+
+                # Check if neighbour is better
+                if frwd_neighbour not in frwd_edge_distance or frwd_neighbour_weight < frwd_edge_distance[frwd_neighbour]:
+                    # Set distance to neighbour and last vertex in search
+                    frwd_edge_distance[frwd_neighbour] = frwd_neighbour_weight
+                    frwd_last_vertex[frwd_neighbour] = frwd_current_vertex
+
+                    # Add weight and neighbouring vertex heap to forward prio queue
+                    heapq.heappush(frwd_prio_queue,
+                                   (frwd_neighbour_weight, frwd_neighbour))
+
+                    # Check if neighbour already visited by backward search and path is lower total distance so far
+                    if frwd_neighbour in bkwd_edge_distance:
+                        total_distance = frwd_neighbour_weight + bkwd_edge_distance[frwd_neighbour]
+                        if total_distance < min_distance:
+                            # Set new meeting vertex and minimum distance
+                            meeting_vertex = frwd_neighbour
+                            min_distance = total_distance
+
+        if not frwd_prio_queue:
+            break
 
         # Backward search
         # Did not include commenting as would be practically the same as forward search steps
         bkwd_edge_weight, bkwd_current_vertex = heapq.heappop(bkwd_prio_queue)
 
-        if bkwd_current_vertex in frwd_edge_distance:
-            total_distance = frwd_edge_distance[bkwd_current_vertex] + \
-                bkwd_edge_distance[bkwd_current_vertex]
+        if bkwd_edge_weight <= bkwd_edge_distance[bkwd_current_vertex]:
+            for bkwd_neighbour, bkwd_weight in network.in_edges(bkwd_current_vertex):
+                if (admissible_vertices is not None and bkwd_neighbour not in admissible_vertices) or (
+                        bkwd_neighbour in excluded_edges and bkwd_current_vertex in excluded_edges[bkwd_neighbour]):
+                    continue
 
-            if total_distance < min_distance:
-                meeting_vertex = bkwd_current_vertex
-                min_distance = total_distance
+                bkwd_neighbour_weight = bkwd_edge_weight + bkwd_weight
 
-        if bkwd_edge_weight > bkwd_edge_distance[bkwd_current_vertex]:
-            continue
-
-        for bkwd_neighbour, bkwd_weight in network[bkwd_current_vertex].items():
-            bkwd_neighbour_weight = bkwd_edge_distance[bkwd_current_vertex] + bkwd_weight
+                if bkwd_neighbour not in bkwd_edge_distance or bkwd_neighbour_weight < bkwd_edge_distance[bkwd_neighbour]:
+                    bkwd_edge_distance[bkwd_neighbour] = bkwd_neighbour_weight
+                    bkwd_last_vertex[bkwd_neighbour] = bkwd_current_vertex
 
-            if bkwd_neighbour not in bkwd_edge_distance or bkwd_neighbour_weight < bkwd_edge_distance[bkwd_neighbour]:
-                bkwd_edge_distance[bkwd_neighbour] = bkwd_neighbour_weight
-                bkwd_last_vertex[bkwd_neighbour] = bkwd_current_vertex
+                    heapq.heappush(bkwd_prio_queue,
+                                   (bkwd_neighbour_weight, bkwd_neighbour))
 
-                heapq.heappush(bkwd_prio_queue,
-                               (bkwd_neighbour_weight, bkwd_neighbour))
+                    if bkwd_neighbour in frwd_edge_distance:
+                        total_distance = frwd_edge_distance[bkwd_neighbour] + bkwd_neighbour_weight
+                        if total_distance < min_distance:
+                            meeting_vertex = bkwd_neighbour
+                            min_distance = total_distance
 
     # Check if no path found
     if meeting_vertex is None:
@@ -240,90 +476,220 @@ def bidirectional_dijkstra(network, source, destination):
     return path, min_distance
 
 
-@timer
-def execute_ksp_yen(network, source, destination, k_paths):
+def dijkstra(network, source, reverse=False, frwd_distance=None, max_distance=float('inf')):
     """
-    Execute Yen's algorithm to find the k shortest paths between the source and destination in a network.
+    Helper function implementing Dijkstra's algorithm to find the shortest path tree from a source.
 
     Parameters:
-    network (defaultdict): A dictionary structure representing the network.
+    network (Network): The network to search.
     source (str): The source vertex.
-    destination (str): The destination vertex.
-    k_paths (int): The number of shortest paths to find.
+    reverse (bool): Search along edges backwards, finding distances to the source instead.
+    frwd_distance (dict): Optional distances from the other end of a path, limiting the search to vertices in both.
+    max_distance (float): Vertices are only reached while their distance plus any frwd_distance is within this.
 
     Returns:
-    distances (list): A list of distances of the k shortests paths in the network.
+    edge_distance (dict): The shortest distance to every reachable vertex.
+    last_vertex (dict): The previous vertex on the shortest path to every reachable vertex but the source.
     """
-    # Initialise our path lists and track removed edges
-    paths = []
-    possible_paths = []
-    rmd_edges = defaultdict(list)
+    edges = network.in_edges if reverse else network.out_edges
 
-    # We use a bi-directional dijkstra's algorithmn to find the actual shortest path first
-    first_path, first_distance = bidirectional_dijkstra(
-        network, source, destination)
-    # Check if we found a valid path from source to dest
-    if first_path is None:
-        return paths
+    edge_distance = {source: 0}
+    last_vertex = {}
+    prio_queue = [(0, source)]
 
-    # Append path and associated distance, as we need to sort by the path distance later and this makes it easier
-    paths.append((first_path, first_distance))
+    while prio_queue:
+        edge_weight, current_vertex = heapq.heappop(prio_queue)
 
-    # Loop through k - 1 times to find rest of paths
-    for _ in range(k_paths - 1):
-        # Loop 1 less time than the length of the shortest path found earlier
-        for i in range(len(paths[-1][0]) - 1):
-            # Create a temporary vertex and root path leading to the temp vertex
-            temp_vertex = paths[-1][0][i]
-            root_path = paths[-1][0][:i + 1]
-
-            # Check if root path has less than 2 vertices, skip if so
-            if len(root_path) < 2:
+        if edge_weight > edge_distance[current_vertex]:
+            continue
+
+        for neighbour, weight in edges(current_vertex):
+            neighbour_weight = edge_weight + weight
+
+            # Skip neighbours that cannot lie on a path within the maximum distance
+            if frwd_distance is not None:
+                if neighbour not in frwd_distance or frwd_distance[neighbour] + neighbour_weight > max_distance:
+                    continue
+            elif neighbour_weight > max_distance:
                 continue
 
-            # Loop through current paths to remove edges from paths
-            for path, _ in paths:
-                if root_path == path[:i + 1]:
-                    rmd_edges[root_path[-2]].append(path[-2])
+            if neighbour not in edge_distance or neighbour_weight < edge_distance[neighbour]:
+                edge_distance[neighbour] = neighbour_weight
+                last_vertex[neighbour] = current_vertex
+                heapq.heappush(prio_queue, (neighbour_weight, neighbour))
 
-            # Update network, removing edges
-            for path, _ in paths[:-1]:
-                if temp_vertex in path:
-                    # Store original weight and set temp edge weight to inf
-                    og_edge_weight = network[path[-2]][path[-1]]
-                    network[path[-2]][path[-1]] = float('inf')
+    return edge_distance, last_vertex
 
-            # Find path from temp vertex to destinations
-            temp_path, temp_distance = bidirectional_dijkstra(
-                network, temp_vertex, destination)
 
-            # Add to possible paths if we reached the destination
-            if temp_path and temp_path[-1] == destination:
-                possible_paths.append(
-                    (root_path[:-1] + temp_path, paths[-1][1] + temp_distance))
+def yen_iterations(network, trie, first_node, destination, k_paths, frwd_distance):
+    """
+    Run Yen's iterations from a shortest path already held in the trie.
 
-            # Rebuild network
-            for path, _ in paths[:-1]:
-                if temp_vertex in path:
-                    network[path[-2]][path[-1]] = og_edge_weight
+    Accepted and candidate paths are held in the PathTrie, so candidates share their root paths and the
+    edges to remove for a root path are the accepted children of its last trie node.
 
-            # Replace removed edges
-            for vertex in rmd_edges[root_path[-2]]:
-                network[root_path[-2]][vertex] = float('inf')
+    Spur searches only run on the admissible subgraph, the vertices v with d(s, v) + d(v, t) no greater
+    than the k-th best cost among accepted and candidate paths, which shrinks as better candidates are found.
+    The reverse distances d(v, t) are only searched for once that cost is known, within the corridor it allows.
+
+    Parameters:
+    network (Network): The network to search.
+    trie (PathTrie): The trie holding the shortest path, rooted at the source.
+    first_node (int): The last trie node of the shortest path.
+    destination (str): The destination vertex.
+    k_paths (int): The number of shortest paths to find.
+    frwd_distance (dict): The shortest distance from the source to every reachable vertex.
+
+    Returns:
+    distances (list): A list of distances of the k shortests paths in the network.
+    """
+    # Accepted paths are kept as their last trie node
+    paths = [first_node]
+    # Track every trie node lying on an accepted path, and the last node of every path seen
+    accepted_nodes = set(trie.chain(first_node))
+    seen_paths = {first_node}
+    # Sorted candidate path distances and their last trie node, only the best k - 1 can ever be accepted
+    possible_paths = []
+    max_cost = float('inf')
+    # Every vertex reached from the source is admissible until the pool first fills and gives a cost bound
+    admissible_vertices = set(frwd_distance)
+    vertex_costs = None
+
+    # Loop through k - 1 times to find rest of paths
+    for _ in range(k_paths - 1):
+        # Walk up the last accepted path, spurring from every node before the destination. Spurs near the
+        # destination are short searches that fill the pool first, so the long ones near the source run bounded
+        last_path = trie.chain(paths[-1])
+        # Root path vertices are left out of spur searches to keep paths loopless
+        root_vertices = [trie.vertex[node] for node in last_path[:-2]]
+        admissible_vertices.difference_update(root_vertices)
+
+        for spur_node in reversed(last_path[:-1]):
+            spur_vertex = trie.vertex[spur_node]
+
+            # Remove the next edge of every accepted path sharing this root path
+            rmd_edges = {spur_vertex: {
+                vertex for vertex, child in trie.children[spur_node].items() if child in accepted_nodes}}
+
+            # Find path from spur vertex to destination within the admissible subgraph and cost bound
+            spur_path, _ = bidirectional_dijkstra(
+                network, spur_vertex, destination, admissible_vertices, rmd_edges,
+                max_cost + abs(max_cost) * COST_TOLERANCE - trie.cost[spur_node])
+
+            # Add to possible paths if we reached the destination with a path not already seen
+            if spur_path is not None:
+                node = trie.extend(spur_node, spur_path[1:], network)
+                if node not in seen_paths:
+                    seen_paths.add(node)
+                    bisect.insort(possible_paths, (trie.cost[node], node))
+                    del possible_paths[k_paths - len(paths):]
+
+                    # Tighten the admissible subgraph once the pool holds every path still needed
+                    if len(possible_paths) == k_paths - len(paths):
+                        max_cost = possible_paths[-1][0]
+                        cost_limit = max_cost + abs(max_cost) * COST_TOLERANCE
+
+                        if vertex_costs is None:
+                            # Search backwards from the destination only through the corridor the shared forward
+                            # distances allow, giving the lowest cost of any path through each admissible vertex
+                            bkwd_distance, _ = dijkstra(
+                                network, destination, True, frwd_distance, cost_limit)
+                            vertex_costs = sorted((frwd_distance[vertex] + distance, vertex)
+                                                  for vertex, distance in bkwd_distance.items())
+                            admissible_vertices = set(bkwd_distance).difference(root_vertices)
+
+                        while vertex_costs[-1][0] > cost_limit:
+                            admissible_vertices.discard(vertex_costs.pop()[1])
+
+            # The root path shortens by one vertex for the next spur node up
+            if root_vertices:
+                admissible_vertices.add(root_vertices.pop())
 
         # Exit loop if we have no more possible paths to traverse in the network
         if not possible_paths:
             break
 
-        # Since we kept paths and distances as a tuple, we can easily sort our possible paths based on distances
-        possible_paths.sort(key=lambda p: p[1])
-        # Add the shortest path & distance to our paths list
-        paths.append(possible_paths.pop(0))
+        # Add the shortest possible path to our paths list
+        _, node = possible_paths.pop(0)
+        paths.append(node)
+        accepted_nodes.update(trie.chain(node))
 
     # Clearer to the reader if we utilise list comprehension before returning the result
-    distances = [distance for _, distance in paths]
+    distances = [trie.cost[node] for node in paths]
+    return distances
+
+
+@timer
+def execute_ksp_yen(network, source, destination, k_paths):
+    """
+    Execute Yen's algorithm to find the k shortest paths between the source and destination in a network.
+
+    Parameters:
+    network (Network): The network to search.
+    source (str): The source vertex.
+    destination (str): The destination vertex.
+    k_paths (int): The number of shortest paths to find.
+
+    Returns:
+    distances (list): A list of distances of the k shortests paths in the network.
+    """
+    # A single destination is the one to many search with one entry
+    _, distances = next(execute_ksp_yen_one_to_many(network, source, [destination], k_paths))
     return distances
 
+
+def execute_ksp_yen_one_to_many(network, source, destinations, k_paths):
+    """
+    Execute Yen's algorithm from one source to many destinations, yielding each destination's results as found.
+
+    A single shortest path tree from the source gives the first path to every destination and the forward
+    distances used to prune spur searches, and all paths are held in one PathTrie so root paths common
+    to several destinations are stored once.
+
+    Parameters:
+    network (Network): The network to search.
+    source (str): The source vertex.
+    destinations (list): The destination vertices.
+    k_paths (int): The number of shortest paths to find for each destination.
+
+    Yields:
+    destination (str): The destination vertex.
+    distances (list): A list of distances of the k shortests paths to the destination.
+    """
+    # One forward search from the source is shared by every destination
+    frwd_distance, last_vertex = dijkstra(network, source)
+
+    # Trie node of every shortest path tree vertex inserted so far
+    trie = PathTrie(source)
+    tree_nodes = {source: 0}
+    # Distances already found, for destinations listed more than once
+    found_distances = {}
+
+    for destination in destinations:
+        if destination in found_distances:
+            yield destination, found_distances[destination]
+            continue
+
+        # Check if we found a valid path from source to dest
+        if destination not in frwd_distance:
+            yield destination, []
+            continue
+
+        # Climb the tree until reaching a vertex already in the trie, then insert the rest of the path below it
+        tree_path = []
+        current_vertex = destination
+        while current_vertex not in tree_nodes:
+            tree_path.append(current_vertex)
+            current_vertex = last_vertex[current_vertex]
+
+        node = tree_nodes[current_vertex]
+        for vertex in reversed(tree_path):
+            node = trie.extend(node, [vertex], network)
+            tree_nodes[vertex] = node
+
+        found_distances[destination] = yen_iterations(network, trie, node, destination, k_paths, frwd_distance)
+        yield destination, found_distances[destination]
+
 ##############
 ### DRIVER ###
 ##############
@@ -331,25 +697,37 @@ def execute_ksp_yen(network, source, destination, k_paths):
 
 if __name__ == '__main__':
     # Get the input file path from command line arguments
-    input_file_path = get_input_file()
+    input_file_path, undirected = get_input_file()
 
     # Get the input lines from text file
-    network, num_vertices, num_edges, source, destination, k_paths = process_input_file(
-        input_file_path)
+    network, num_vertices, num_edges, source, destinations, k_paths = process_input_file(
+        input_file_path, undirected)
+
+    if len(destinations) == 1:
+        # Execute algorithm function with timer decorator
+        distances, elapsed_time = execute_ksp_yen(
+            network, source, destinations[0], k_paths)
+        print("\nResults")
 
-    # Execute algorithm function with timer decorator
-    distances, elapsed_time = execute_ksp_yen(
-        network, source, destination, k_paths)
-    print("\nResults")
+        if not distances:
+            print("No path was found from source to destination.\n")
 
-    if not distances:
-        print("No path was found from source to destination.\n")
+        else:
+            # Print distances of k shortests paths, separated by commas
+            print(format_distances(distances))
 
     else:
-        # Print distances of k shortests paths, separated by commas
-        for distance in distances[:-1]:
-            sys.stdout.write(f"{distance:.4f}, ")
-        sys.stdout.write(f"{distances[-1]:.4f}\n")
+        # Results are streamed per destination, so time the whole run here rather than with the timer decorator
+        print("\nResults")
+        start_time = time.perf_counter()
+
+        for destination, distances in execute_ksp_yen_one_to_many(network, source, destinations, k_paths):
+            if not distances:
+                print(f"{destination}: No path was found from source to destination.", flush=True)
+            else:
+                print(f"{destination}: {format_distances(distances)}", flush=True)
+
+        elapsed_time = (time.perf_counter() - start_time) * 1_000
 
     # Display execution time
     print(f"Execution time - {elapsed_time:.2f} milliseconds\n")